@@ -0,0 +1,21 @@
+from setuptools import setup, Extension
+
+# Build the AOT-compiled simulation kernel when Cython is available;
+# without it the package still works through the Numba/pure-Python
+# kernels in src/_simulate_numba.py
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize(
+        [Extension('src._simulate_ext', ['src/_simulate_ext.pyx'])],
+        language_level=3)
+except ImportError:
+    ext_modules = []
+
+setup(
+    name='PyDebtZero',
+    version='0.1.0',
+    description='Debt payment strategy planner',
+    packages=['src'],
+    install_requires=['numpy'],
+    ext_modules=ext_modules,
+)
@@ -1,3 +1,4 @@
+import math
 import numpy as np
 
 class Loan(object):
@@ -7,17 +8,74 @@ class Loan(object):
 
     def __init__(self, name, principal_amount, apr, min_payment=None,
                  months_to_pay=120):
-        # Loan properties
+        # Loan properties, coerced to float so downstream array
+        # construction is uniformly float64
         self.name = name
-        self.principal_amount = principal_amount
-        self.apr = apr
+        self.principal_amount = float(principal_amount)
+        self.apr = float(apr)
         self.months_to_desired_completion = months_to_pay
 
-        # Simulation parameters
+        # Monthly interest rate, fixed for the life of the loan; cached
+        # here so the simulation does not walk the property chain every
+        # month
+        self._monthly_rate = (self.apr/100.)/12.
+
+        # Simulation parameters; the balance may be backed by a view
+        # into a Wallet-owned array during a simulation
+        self._bal_view = None
         self.amount_still_owed = None
 
         # Optional parameters
-        self.minimum_payment_default = min_payment
+        self.minimum_payment_default = (None if min_payment is None
+                                        else float(min_payment))
+
+        # Cached minimum payment, computed lazily on first access so the
+        # simulation loop does not redo the annuity formula every month
+        self._min_payment = None
+
+    @classmethod
+    def from_arrays(cls, names, principal_amounts, aprs, months_to_pay=120):
+        """
+        Builds a list of Loan objects from arrays of loan parameters,
+        computing all minimum payments in a single vectorized
+        numpy_financial.pmt call.
+        """
+        import numpy_financial as npf
+
+        # Coerce inputs to float64 arrays and broadcast scalar inputs
+        principal_amounts = np.asarray(principal_amounts, dtype=np.float64)
+        aprs = np.asarray(aprs, dtype=np.float64)
+        months_to_pay = np.broadcast_to(np.asarray(months_to_pay),
+                                        principal_amounts.shape)
+
+        # Compute all minimum payments at once (pmt returns payments as
+        # negative cash flow, so negate the principal)
+        min_payments = npf.pmt(aprs/1200., months_to_pay, -principal_amounts)
+
+        # Construct loans with precomputed minimum payments
+        loans = []
+        for iloan,name in enumerate(names):
+            loan = cls(name, float(principal_amounts[iloan]),
+                       float(aprs[iloan]),
+                       months_to_pay=int(months_to_pay[iloan]))
+            loan._min_payment = float(min_payments[iloan])
+            loans.append(loan)
+        return loans
+
+    @property
+    def amount_still_owed(self):
+        # Read through the wallet-owned balance array when bound, so no
+        # Python float is boxed per simulation update
+        if self._bal_view is not None:
+            return self._bal_view[0]
+        return self._amount_still_owed
+
+    @amount_still_owed.setter
+    def amount_still_owed(self, value):
+        if self._bal_view is not None:
+            self._bal_view[0] = value
+        else:
+            self._amount_still_owed = value
 
     @property
     def yearly_interest_rate(self):
@@ -28,11 +86,13 @@ class Loan(object):
     @property
     def minimum_payment(self):
         # Use default payment if one is specified, otherwise compute a
-        # minimum
+        # minimum once and cache it for subsequent accesses
         if self.minimum_payment_default is not None:
             payment = self.minimum_payment_default
         else:
-            payment = self.compute_minimum_required_payment()
+            if self._min_payment is None:
+                self._min_payment = self.compute_minimum_required_payment()
+            payment = self._min_payment
         return payment
 
     @property
@@ -49,13 +109,13 @@ class Loan(object):
 
     @property
     def monthly_interest_rate(self):
-        return self.yearly_interest_rate/12.
+        return self._monthly_rate
 
     @property
     def monthly_interest_amp(self):
         # Returns the monthly amplification factor to be applied to the
         # principal amount to account for compounding interest.
-        return 1+self.monthly_interest_rate
+        return 1+self._monthly_rate
 
 
     def compute_minimum_required_payment(self):
@@ -67,8 +127,10 @@ class Loan(object):
         if self.monthly_interest_rate == 0:
             minimum_payment = self.principal_amount/self.months_to_desired_completion
         else:
-            # Interest amplification factor to reach full loan payment
-            amp = (1+self.monthly_interest_rate)**self.months_to_desired_completion
+            # Interest amplification factor to reach full loan payment;
+            # exp/log1p is tighter than generic pow for small rates
+            amp = math.exp(self.months_to_desired_completion
+                           * math.log1p(self.monthly_interest_rate))
 
             # Compute min payment
             minimum_payment = self.monthly_interest_rate*self.principal_amount*amp/(amp - 1.)
@@ -76,12 +138,42 @@ class Loan(object):
         # Return minimum payment
         return minimum_payment
 
+    def months_to_payoff(self, balance, payment):
+        """
+        Computes the number of monthly cycles needed to pay off the
+        given balance at a constant monthly payment, using the
+        closed-form amortization expression instead of simulating month
+        by month. Payments are applied before interest accrues, matching
+        the simulation convention. Returns np.inf if the payment can
+        never pay off the balance.
+        """
+        # Nothing owed means nothing to pay
+        if balance <= 0.:
+            return 0
+
+        # Without interest the balance shrinks linearly
+        if payment <= 0.:
+            return np.inf
+        if self.monthly_interest_rate == 0.:
+            return int(math.ceil(balance/payment))
+
+        # Steady-state balance the payment can sustain; anything at or
+        # above it is never paid off
+        sustained_balance = payment*(1. + self.monthly_interest_rate)/self.monthly_interest_rate
+        if sustained_balance <= balance:
+            return np.inf
+
+        # Invert the closed-form balance recurrence for the first month
+        # at which the balance reaches zero
+        return int(math.ceil(-math.log1p(-balance/sustained_balance)
+                             / math.log1p(self.monthly_interest_rate)))
+
     def compute_single_cycle_earned_interest(self):
         """
         Computes the interest earned in a single cycle given the current
         simulation amount still owed.
         """
-        return self.principal_amount*(self.monthly_interest_amp - 1)
+        return self.principal_amount*self._monthly_rate
 
     def compute_single_cycle_earned_interest_simulation(self):
         """
@@ -91,7 +183,7 @@ class Loan(object):
         if self.amount_still_owed is None:
             earned_interest = 0.
         else:
-            earned_interest = self.amount_still_owed*(self.monthly_interest_amp - 1)
+            earned_interest = self.amount_still_owed*self._monthly_rate
         return earned_interest
 
 
@@ -1,6 +1,67 @@
+import io
 import os
 import numpy as np
-import operator
+
+try:
+    from . import _simulate_numba
+except ImportError:
+    import _simulate_numba
+
+# Prefer the ahead-of-time compiled Cython kernels when the extension
+# was built (no Numba warmup on cold starts); otherwise fall back to
+# the Numba/pure-Python kernels
+try:
+    try:
+        from . import _simulate_ext as _kernels
+    except ImportError:
+        import _simulate_ext as _kernels
+except ImportError:
+    _kernels = _simulate_numba
+
+# With neither the Cython extension nor Numba the month loop runs as
+# plain Python; the phase-by-phase closed-form driver then replaces it
+# for the order kinds whose allocation is constant between payoffs
+_HAVE_COMPILED_KERNELS = (_kernels is not _simulate_numba
+                          or _simulate_numba.HAVE_NUMBA)
+
+def _phase_balances(bal, pay, rates, months):
+    """
+    Evaluates the closed form of the balance recurrence
+    b' = (b - p)*(1 + r) after the given number of months under a
+    constant payment vector. months may be a scalar or an (m, 1)
+    column to materialize a whole block of months at once.
+    """
+    months = np.asarray(months, dtype=np.float64)
+    safe_rates = np.where(rates > 0., rates, 1.)
+    sustained = np.where(rates > 0., pay*(1. + rates)/safe_rates, 0.)
+    growth = np.exp(months*np.log1p(rates))
+    return np.where(rates > 0.,
+                    (bal - sustained)*growth + sustained,
+                    bal - pay*months)
+
+
+def _months_below(bal, pay, rate, threshold):
+    """
+    Returns the first month at which the closed-form balance recurrence
+    drops strictly below the given threshold under a constant payment,
+    or np.inf if it never does.
+    """
+    if bal < threshold:
+        return 0
+    if rate == 0.:
+        if pay <= 0.:
+            return np.inf
+        return int(np.floor((bal - threshold)/pay)) + 1
+
+    # A balance at or above the sustained level never decreases
+    sustained = pay*(1. + rate)/rate
+    if sustained <= bal:
+        return np.inf
+
+    # Invert the closed form for the first month below the threshold
+    return int(np.floor(np.log((sustained - threshold)/(sustained - bal))
+                        / np.log1p(rate))) + 1
+
 
 class Wallet(object):
     """
@@ -21,43 +82,29 @@ class Wallet(object):
 
     @property
     def total_still_owed(self):
-        total_still_owed = 0.
-        for loan in self.loans.values():
-            total_still_owed += loan.amount_still_owed
-        return total_still_owed
+        return sum(loan.amount_still_owed for loan in self.loans.values())
 
     def generate_debt_snowball_plan(self):
         """
         Generates a debt-snowball debt payment strategy plan.
         """
+        self._run_plan(_simulate_numba.ORDER_SNOWBALL, 'Debt-Snowball')
+
+    def _run_plan(self, order_kind, method_name):
+        """
+        Shared driver for the debt payment strategies: initializes the
+        simulation state, runs the payoff kernel with the given
+        priority-order kind, and records the method used and total time
+        passed.
+        """
         # Initialize start of simulation parameters
         self._initialize_simulation()
 
-        # Perform debt-snowball until total owed is paid
-        months_passed = 0
-        while self.total_still_owed > 0.:
-            # Record current balances
-            for loan_id,loan in self.loans.iteritems():
-                self.balance_history[loan_id].append(loan.amount_still_owed)
-
-            # Compute, record, and apply debt-snowball payments
-            payments = self.get_debt_snowball_payment_installment()
-            for loan_id,loan in self.loans.iteritems():
-                self.payment_history[loan_id].append(payments[loan_id])
-                loan.amount_still_owed -= payments[loan_id]
-
-            # Compute and record interest earned in current pay cycle,
-            # then update amount owed on each loan with earned interest
-            for loan_id,loan in self.loans.iteritems():
-                earned_interest = loan.compute_single_cycle_earned_interest_simulation()
-                self.interest_history[loan_id].append(earned_interest)
-                loan.amount_still_owed += earned_interest
-
-            # Increment month counter
-            months_passed += 1
+        # Run the compiled month-by-month payoff kernel
+        months_passed = self._simulate(order_kind)
 
         # Update method used and total time passed
-        self.method_used_name = 'Debt-Snowball'
+        self.method_used_name = method_name
         self.months_in_history = months_passed
 
 
@@ -66,198 +113,243 @@ class Wallet(object):
         Determines the amount to pay to each loan according to the
         debt-snowball procedure.
         """
-        # Initialize empty payment dictionary
-        payments = {}
-
-        # Get minimum payments required on all loans
-        for loan_id,loan in self.loans.iteritems():
-            payments[loan_id] = loan.minimum_payment_simulation
-
-        # Amount left after making minimum payments
-        amount_left = self.budget_ceiling - np.sum(payments.values())
-
-        # Up until remaining amount is used up, pay loans starting from
-        # one with the lowest amount due
-        loan_priority_ids = self.get_debt_snowball_loan_priority_ids()
-        for loan_id in loan_priority_ids:
-            loan_amount_still_owed = (self.loans[loan_id].amount_still_owed
-                                      - payments[loan_id])
-            if loan_amount_still_owed == 0.:
-                continue
-            elif amount_left <= loan_amount_still_owed:
-                payments[loan_id] += amount_left
-                break
-            else:
-                payments[loan_id] += loan_amount_still_owed
-                amount_left -= loan_amount_still_owed
+        # Gather balances and minimum payments as arrays
+        loan_ids = list(self.loans.keys())
+        bal = np.array([self.loans[loan_id].amount_still_owed
+                        for loan_id in loan_ids], dtype=np.float64)
+        pay = np.array([self.loans[loan_id].minimum_payment_simulation
+                        for loan_id in loan_ids], dtype=np.float64)
+
+        # Distribute leftover budget starting from the loan with the
+        # lowest amount due
+        amount_left = self.budget_ceiling - pay.sum()
+        order = np.argsort(bal, kind='stable')
+        pay = self._allocate(bal, pay, order, amount_left)
 
         # Return payment installment
-        return payments
+        return dict(zip(loan_ids, pay))
 
     def get_debt_snowball_loan_priority_ids(self):
         """
         Returns the list of loan IDs in order of lowest to greatest
         amount due.
         """
-        loan_priority_dict = {loan_id:loan.amount_still_owed for (loan_id,loan) in self.loans.iteritems()}
-        loan_priority_tuples = sorted(loan_priority_dict.items(), key=operator.itemgetter(1))
-        loan_priority_ids = [loan_priority_tuple[0] for loan_priority_tuple in loan_priority_tuples]
-        return loan_priority_ids
+        loan_ids = list(self.loans.keys())
+        amounts_owed = np.array([loan.amount_still_owed
+                                 for loan in self.loans.values()], dtype=np.float64)
+        order = np.argsort(amounts_owed, kind='stable')
+        return [loan_ids[iloan] for iloan in order]
 
     def generate_debt_avalanche_plan(self):
         """
         Generates a debt-avalanche debt payment strategy plan.
         """
-        # Initialize start of simulation parameters
-        self._initialize_simulation()
-
-        # Perform debt-avalanche until total owed is paid
-        months_passed = 0
-        while self.total_still_owed > 0.:
-            # Record current balances
-            for loan_id,loan in self.loans.iteritems():
-                self.balance_history[loan_id].append(loan.amount_still_owed)
-
-            # Compute, record, and apply debt-avalanche payments
-            payments = self.get_debt_avalanche_payment_installment()
-            for loan_id,loan in self.loans.iteritems():
-                self.payment_history[loan_id].append(payments[loan_id])
-                loan.amount_still_owed -= payments[loan_id]
-
-            # Compute and record interest earned in current pay cycle,
-            # then update amount owed on each loan with earned interest
-            for loan_id,loan in self.loans.iteritems():
-                earned_interest = loan.compute_single_cycle_earned_interest_simulation()
-                self.interest_history[loan_id].append(earned_interest)
-                loan.amount_still_owed += earned_interest
-
-            # Increment month counter
-            months_passed += 1
-
-        # Update method used and total time passed
-        self.method_used_name = 'Debt-Avalanche'
-        self.months_in_history = months_passed
+        self._run_plan(_simulate_numba.ORDER_AVALANCHE, 'Debt-Avalanche')
 
     def get_debt_avalanche_payment_installment(self):
         """
         Determines the amount to pay to each loan according to the
         debt-avalanche procedure.
         """
-        # Initialize empty payment dictionary
-        payments = {}
-
-        # Get minimum payments required on all loans
-        for loan_id,loan in self.loans.iteritems():
-            payments[loan_id] = loan.minimum_payment_simulation
-
-        # Amount left after making minimum payments
-        amount_left = self.budget_ceiling - np.sum(payments.values())
-
-        # Up until remaining amount is used up, pay loans starting from
-        # one with the largest interest rate
-        loan_priority_ids = self.get_debt_avalanche_loan_priority_ids()
-        for loan_id in loan_priority_ids:
-            loan_amount_still_owed = (self.loans[loan_id].amount_still_owed
-                                      - payments[loan_id])
-            if loan_amount_still_owed == 0.:
-                continue
-            elif amount_left <= loan_amount_still_owed:
-                payments[loan_id] += amount_left
-                break
-            else:
-                payments[loan_id] += loan_amount_still_owed
-                amount_left -= loan_amount_still_owed
+        # Gather balances, rates, and minimum payments as arrays
+        loan_ids = list(self.loans.keys())
+        bal = np.array([self.loans[loan_id].amount_still_owed
+                        for loan_id in loan_ids], dtype=np.float64)
+        rates = np.array([self.loans[loan_id].yearly_interest_rate
+                          for loan_id in loan_ids], dtype=np.float64)
+        pay = np.array([self.loans[loan_id].minimum_payment_simulation
+                        for loan_id in loan_ids], dtype=np.float64)
+
+        # Distribute leftover budget starting from the loan with the
+        # largest interest rate
+        amount_left = self.budget_ceiling - pay.sum()
+        order = np.argsort(rates, kind='stable')[::-1]
+        pay = self._allocate(bal, pay, order, amount_left)
 
         # Return payment installment
-        return payments
+        return dict(zip(loan_ids, pay))
 
     def get_debt_avalanche_loan_priority_ids(self):
         """
         Returns the list of loan IDs in order of largest to smallest
         interest rate.
         """
-        loan_priority_dict = {loan_id:loan.yearly_interest_rate for (loan_id,loan) in self.loans.iteritems()}
-        loan_priority_tuples = sorted(loan_priority_dict.items(), key=operator.itemgetter(1))
-        loan_priority_ids_s2l = [loan_priority_tuple[0] for loan_priority_tuple in loan_priority_tuples]
-        loan_priority_ids_l2s = loan_priority_ids_s2l[::-1]
-        return loan_priority_ids_l2s
+        loan_ids = list(self.loans.keys())
+        rates = np.array([loan.yearly_interest_rate
+                          for loan in self.loans.values()], dtype=np.float64)
+        order = np.argsort(rates, kind='stable')[::-1]
+        return [loan_ids[iloan] for iloan in order]
 
     def generate_debt_spiral_plan(self):
         """
         Generates a debt-spiral debt payment strategy plan.
         """
-        # Initialize start of simulation parameters
-        self._initialize_simulation()
-
-        # Perform debt-spiral until total owed is paid
-        months_passed = 0
-        while self.total_still_owed > 0.:
-            # Record current balances
-            for loan_id,loan in self.loans.iteritems():
-                self.balance_history[loan_id].append(loan.amount_still_owed)
-
-            # Compute, record, and apply debt-spiral payments
-            payments = self.get_debt_spiral_payment_installment()
-            for loan_id,loan in self.loans.iteritems():
-                self.payment_history[loan_id].append(payments[loan_id])
-                loan.amount_still_owed -= payments[loan_id]
-
-            # Compute and record interest earned in current pay cycle,
-            # then update amount owed on each loan with earned interest
-            for loan_id,loan in self.loans.iteritems():
-                earned_interest = loan.compute_single_cycle_earned_interest_simulation()
-                self.interest_history[loan_id].append(earned_interest)
-                loan.amount_still_owed += earned_interest
-
-            # Increment month counter
-            months_passed += 1
-
-        # Update method used and total time passed
-        self.method_used_name = 'Debt-Spiral'
-        self.months_in_history = months_passed
+        self._run_plan(_simulate_numba.ORDER_SPIRAL, 'Debt-Spiral')
 
     def get_debt_spiral_payment_installment(self):
         """
         Determines the amount to pay to each loan according to the
         debt-spiral procedure.
         """
-        # Initialize empty payment dictionary
-        payments = {}
-
-        # Get minimum payments required on all loans
-        for loan_id,loan in self.loans.iteritems():
-            payments[loan_id] = loan.minimum_payment_simulation
-
-        # Amount left after making minimum payments
-        amount_left = self.budget_ceiling - np.sum(payments.values())
-
-        # Up until remaining amount is used up, pay loans starting from
-        # one with the largest ratio of interest rate to amount owed
-        loan_priority_ids = self.get_debt_spiral_loan_priority_ids()
-        for loan_id in loan_priority_ids:
-            loan_amount_still_owed = (self.loans[loan_id].amount_still_owed
-                                      - payments[loan_id])
-            if loan_amount_still_owed == 0.:
-                continue
-            elif amount_left <= loan_amount_still_owed:
-                payments[loan_id] += amount_left
-                break
-            else:
-                payments[loan_id] += loan_amount_still_owed
-                amount_left -= loan_amount_still_owed
+        # Gather balances, APRs, and minimum payments as arrays
+        loan_ids = list(self.loans.keys())
+        bal = np.array([self.loans[loan_id].amount_still_owed
+                        for loan_id in loan_ids], dtype=np.float64)
+        aprs = np.array([self.loans[loan_id].apr
+                         for loan_id in loan_ids], dtype=np.float64)
+        pay = np.array([self.loans[loan_id].minimum_payment_simulation
+                        for loan_id in loan_ids], dtype=np.float64)
+
+        # Distribute leftover budget starting from the loan with the
+        # largest ratio of interest rate to amount owed
+        amount_left = self.budget_ceiling - pay.sum()
+        order = np.argsort(bal/aprs, kind='stable')
+        pay = self._allocate(bal, pay, order, amount_left)
 
         # Return payment installment
-        return payments
+        return dict(zip(loan_ids, pay))
 
     def get_debt_spiral_loan_priority_ids(self):
         """
         Returns the list of loan IDs in order of largest to smallest
         interest rate to amount owed ratio.
         """
-        loan_priority_dict = {loan_id:loan.amount_still_owed/loan.apr for (loan_id,loan) in self.loans.iteritems()}
-        loan_priority_tuples = sorted(loan_priority_dict.items(), key=operator.itemgetter(1))
-        loan_priority_ids = [loan_priority_tuple[0] for loan_priority_tuple in loan_priority_tuples]
-        return loan_priority_ids
+        loan_ids = list(self.loans.keys())
+        owed_to_rate = np.array([loan.amount_still_owed/loan.apr
+                                 for loan in self.loans.values()], dtype=np.float64)
+        order = np.argsort(owed_to_rate, kind='stable')
+        return [loan_ids[iloan] for iloan in order]
+
+    def compare_strategies(self):
+        """
+        Runs the debt-snowball, debt-avalanche, and debt-spiral
+        strategies on the same loan set in a single batched kernel call
+        and returns a dictionary keyed by method name holding the
+        months to payoff and the (months, loans) history arrays for
+        each strategy. Strategies the budget can never pay off report
+        -1 months and empty histories. The wallet's own recorded plan
+        is not modified.
+        """
+        # Gather the shared loan state and replicate it per strategy
+        loans = tuple(self.loans.values())
+        n_loans = len(loans)
+        order_kinds = np.array([_simulate_numba.ORDER_SNOWBALL,
+                                _simulate_numba.ORDER_AVALANCHE,
+                                _simulate_numba.ORDER_SPIRAL], dtype=np.int64)
+        method_names = ['Debt-Snowball', 'Debt-Avalanche', 'Debt-Spiral']
+        n_strategies = order_kinds.shape[0]
+        bal0  = np.array([loan.principal_amount for loan in loans], dtype=np.float64)
+        rates = np.tile(np.array([loan.monthly_interest_rate for loan in loans],
+                                 dtype=np.float64), (n_strategies, 1))
+        mins  = np.tile(np.array([loan.minimum_payment for loan in loans],
+                                 dtype=np.float64), (n_strategies, 1))
+        budgets = np.full(n_strategies, self.budget_ceiling, dtype=np.float64)
+
+        # Estimate the simulation horizon from the loan terms and run
+        # all strategies in lockstep, restarting with doubled capacity
+        # if any strategy outlasts the history rows; strategies whose
+        # total balance fails to shrink are diverging and reported as -1
+        max_months = 12
+        if n_loans > 0:
+            max_months = 2*max(loan.months_to_desired_completion
+                               for loan in loans)
+        while True:
+            bal = np.tile(bal0, (n_strategies, 1))
+            balance_hist  = np.empty((n_strategies, max_months, n_loans), dtype=np.float64)
+            payment_hist  = np.empty((n_strategies, max_months, n_loans), dtype=np.float64)
+            interest_hist = np.empty((n_strategies, max_months, n_loans), dtype=np.float64)
+            months_out = np.zeros(n_strategies, dtype=np.int64)
+            _kernels.simulate_batch(bal, rates, mins, budgets,
+                                           order_kinds, balance_hist,
+                                           payment_hist, interest_hist,
+                                           months_out)
+            totals_left = bal.sum(axis=1)
+            unfinished = totals_left > 0.
+            if n_loans == 0 or not unfinished.any():
+                break
+            diverging = unfinished & (totals_left >= bal0.sum())
+            if (diverging == unfinished).all():
+                months_out[unfinished] = -1
+                break
+            max_months *= 2
+
+        # Package per-strategy results; diverging strategies carry no
+        # history rows
+        results = {}
+        for istrategy,method_name in enumerate(method_names):
+            months_passed = int(months_out[istrategy])
+            n_rows = max(months_passed, 0)
+            results[method_name] = {
+                'months_in_history': months_passed,
+                'balance_history':  balance_hist[istrategy, :n_rows],
+                'payment_history':  payment_hist[istrategy, :n_rows],
+                'interest_history': interest_hist[istrategy, :n_rows],
+            }
+        return results
+
+    def simulate_apr_grid(self, apr_grid, order_kind=None):
+        """
+        Runs the loan portfolio against a grid of APR scenarios in a
+        single batched kernel call. apr_grid is a (scenarios, loans)
+        array of APRs in loan order; returns an int64 array of payoff
+        months per scenario, with -1 for scenarios the budget can never
+        pay off. Scenario minimum payments are recomputed from the
+        scenario APRs unless a loan carries an explicit minimum payment.
+        """
+        # Scenario rates from the APR grid
+        if order_kind is None:
+            order_kind = _simulate_numba.ORDER_SNOWBALL
+        loans = tuple(self.loans.values())
+        n_loans = len(loans)
+        apr_grid = np.atleast_2d(np.asarray(apr_grid, dtype=np.float64))
+        n_scenarios = apr_grid.shape[0]
+        rates = apr_grid/1200.
+
+        # Vectorized minimum payments over the whole grid, with any
+        # explicit per-loan minimum payment held fixed across scenarios
+        principals = np.array([loan.principal_amount for loan in loans],
+                              dtype=np.float64)
+        months_to_pay = np.array([loan.months_to_desired_completion
+                                  for loan in loans], dtype=np.float64)
+        amp = np.exp(months_to_pay*np.log1p(rates))
+        min_pmts = np.where(rates > 0.,
+                            rates*principals*amp/np.where(amp > 1., amp - 1., 1.),
+                            principals/months_to_pay)
+        defaults = np.array([np.nan if loan.minimum_payment_default is None
+                             else loan.minimum_payment_default
+                             for loan in loans], dtype=np.float64)
+        min_pmts = np.where(np.isnan(defaults), min_pmts, defaults)
+
+        # Run all scenarios in lockstep, doubling the horizon until
+        # every convergent scenario finishes; scenarios whose total
+        # balance fails to shrink are diverging and reported as -1
+        budgets = np.full(n_scenarios, self.budget_ceiling, dtype=np.float64)
+        order_kinds = np.full(n_scenarios, order_kind, dtype=np.int64)
+        max_months = 12
+        if n_loans > 0:
+            max_months = 2*int(months_to_pay.max())
+        while True:
+            bal = np.tile(principals, (n_scenarios, 1))
+            balance_hist  = np.empty((n_scenarios, max_months, n_loans), dtype=np.float64)
+            payment_hist  = np.empty((n_scenarios, max_months, n_loans), dtype=np.float64)
+            interest_hist = np.empty((n_scenarios, max_months, n_loans), dtype=np.float64)
+            months_out = np.zeros(n_scenarios, dtype=np.int64)
+            _kernels.simulate_batch(bal, rates, min_pmts, budgets,
+                                           order_kinds, balance_hist,
+                                           payment_hist, interest_hist,
+                                           months_out)
+            totals_left = bal.sum(axis=1)
+            unfinished = totals_left > 0.
+            if n_loans == 0 or not unfinished.any():
+                break
+            diverging = unfinished & (totals_left >= principals.sum())
+            if (diverging == unfinished).all():
+                months_out[unfinished] = -1
+                break
+            max_months *= 2
+
+        # Return payoff months per scenario
+        return months_out
 
     def generate_debt_optimized_plan(self):
         """
@@ -277,53 +369,90 @@ class Wallet(object):
         Writes current stored payment plan to a text file for
         viewing/printing purposes.
         """
-        # Initialize file text
-        file_txt = ['pyDebtFree: %s Approach\n'%(self.method_used_name)]
+        # Initialize report buffer
+        buf = io.StringIO()
+        buf.write(f'pyDebtFree: {self.method_used_name} Approach\n')
 
         # Create column labels
         loan_names = [loan.name for loan in self.loans.values()]
-        clabels_owed = ['Months'] + ['%s [Owed]'%name for name in loan_names] + ['Total Owed']
-        clabels_paid = ['Months'] + ['%s [Paid]'%name for name in loan_names] + ['Total Paid']
+        clabels_owed = ['Months'] + [f'{name} [Owed]' for name in loan_names] + ['Total Owed']
+        clabels_paid = ['Months'] + [f'{name} [Paid]' for name in loan_names] + ['Total Paid']
         clabels_interest = ['Months', 'Interest Earned', 'Total Interest']
 
-        # Initialize header row txt and plan summary containers
-        header_txt_owed = ['%16s'%(label) for label in clabels_owed] + ['\n']
-        header_txt_paid = ['%16s'%(label) for label in clabels_paid] + ['\n']
-        header_txt_interest = ['%16s'%(label) for label in clabels_interest] + ['\n']
-        history_owed_txt = ['']
-        history_paid_txt = ['']
-        history_interest_txt = ['']
-
-        # Add plan simulation history
-        running_total_paid = 0.
-        running_total_interest = 0.
-        for imonth in range(self.months_in_history):
-            # Pull necessary information
-            owes  = [self.balance_history[loan_id][imonth] for loan_id in self.loans.keys()]
-            pays  = [self.payment_history[loan_id][imonth] for loan_id in self.loans.keys()]
-            running_total_paid += np.sum(np.array(pays))
-            monthly_interest = np.sum(np.array([self.interest_history[loan_id][imonth] for loan_id in self.loans.keys()]))
-            running_total_interest += monthly_interest
-
-            # Add as row
-            history_owed_txt += ['%16s'%(imonth+1)] + ['%16.2f'%val for val in owes] + ['%16.2f'%(np.sum(owes))] + ['\n']
-            history_paid_txt += ['%16s'%(imonth+1)] + ['%16.2f'%val for val in pays] + ['%16.2f'%(running_total_paid)] + ['\n']
-            history_interest_txt += ['%16s'%(imonth+1)] + ['%16.2f'%(monthly_interest)]  + ['%16.2f'%(running_total_interest)] + ['\n']
-
-        # Combine txt into single file
-        file_txt += header_txt_owed + history_owed_txt + ['\n']*3
-        file_txt += header_txt_paid + history_paid_txt + ['\n']*3
-        file_txt += header_txt_interest + history_interest_txt
+        # Build (months, columns) blocks with the month index and the
+        # running totals computed in single vectorized passes
+        n_loans = len(self.loans)
+        months_col = np.arange(1, self.months_in_history + 1)
+        total_owed_per_month = self._bal_hist.sum(axis=1)
+        total_paid_running = self._pay_hist.sum(axis=1).cumsum()
+        interest_per_month = self._int_hist.sum(axis=1)
+        total_interest_running = interest_per_month.cumsum()
+        owed_block = np.column_stack([months_col, self._bal_hist,
+                                      total_owed_per_month])
+        paid_block = np.column_stack([months_col, self._pay_hist,
+                                      total_paid_running])
+        interest_block = np.column_stack([months_col, interest_per_month,
+                                          total_interest_running])
+
+        # Write each table into the buffer: header row, then the block
+        # formatted in a single savetxt pass
+        fmt_loans = ['%16d'] + ['%16.2f']*(n_loans + 1)
+        for clabels,block,fmt in ((clabels_owed, owed_block, fmt_loans),
+                                  (clabels_paid, paid_block, fmt_loans),
+                                  (clabels_interest, interest_block,
+                                   ['%16d'] + ['%16.2f']*2)):
+            buf.write(''.join(f'{label:>16}' for label in clabels))
+            buf.write('\n')
+            np.savetxt(buf, block, fmt=fmt, delimiter='')
+            if clabels is not clabels_interest:
+                buf.write('\n'*3)
 
         # Determine file output path
-        outname = '%s.txt'%(self.method_used_name)
+        outname = f'{self.method_used_name}.txt'
         if dir_save is None:
             dir_save = os.getcwd()
         path_save = os.path.join(dir_save, outname)
 
-        # Write textto file
+        # Write text to file
         with open(path_save, 'w') as outfile:
-            outfile.writelines(file_txt)
+            outfile.write(buf.getvalue())
+
+    def _allocate(self, bal, pay, order, amount_left):
+        """
+        Distributes the leftover budget across loans in the given
+        priority order and returns the full payment vector.
+
+        Each loan in priority order receives up to its remaining balance
+        (after minimum payments) until the leftover amount runs out. The
+        split point is found with a cumulative sum and searchsorted
+        instead of a per-loan branching loop. A budget deficit comes out
+        of the first loan still owing after minimum payments, as in the
+        branching loop.
+        """
+        # Remaining balance of each loan after minimum payments, in
+        # priority order
+        rem = bal[order] - pay[order]
+        extra = np.zeros_like(rem)
+
+        if amount_left < 0.:
+            # Deficit: reduce the payment of the first loan still owing
+            owing = np.flatnonzero(rem > 0.)
+            if owing.size:
+                extra[owing[0]] = amount_left
+        else:
+            # Find the first loan whose cumulative remaining balance
+            # covers the leftover amount; everything before it is paid
+            # in full
+            csum = np.cumsum(rem)
+            split = np.searchsorted(csum, amount_left)
+            extra[:split] = rem[:split]
+            if split < extra.size:
+                extra[split] = amount_left - (csum[split-1] if split else 0.)
+
+        # Scatter the extra payments back to loan order
+        pay = pay.copy()
+        pay[order] += extra
+        return pay
 
     def _initialize_simulation(self):
         """
@@ -337,12 +466,307 @@ class Wallet(object):
         self.interest_history = {}
         self.method_used_name = None
         self.months_in_history = None
-        for loan_id,loan in self.loans.iteritems():
-            loan.amount_still_owed = 1.*loan.principal_amount
+        for loan_id in self.loans:
             self.payment_history[loan_id] = []
             self.balance_history[loan_id] = []
             self.interest_history[loan_id] = []
 
+        # Freeze the loan iteration order in tuples so the simulation
+        # never re-traverses the loan dict and array columns keep a
+        # stable loan mapping
+        self._loan_ids = tuple(self.loans.keys())
+        self._loan_objs = tuple(self.loans.values())
+        self._id_to_col = {loan_id: iloan
+                           for iloan,loan_id in enumerate(self._loan_ids)}
+
+        # Build structure-of-arrays simulation state, with one fixed
+        # column per loan, so the month loop can run as vectorized
+        # array operations
+        self._bal_hist = None
+        self._pay_hist = None
+        self._int_hist = None
+        self._bal   = np.array([loan.principal_amount
+                                for loan in self._loan_objs], dtype=np.float64)
+        self._rates = np.array([loan.monthly_interest_rate
+                                for loan in self._loan_objs], dtype=np.float64)
+        self._min   = np.array([loan.minimum_payment
+                                for loan in self._loan_objs], dtype=np.float64)
+
+        # Back each loan's amount_still_owed by its element of the
+        # balance array, so per-loan reads and writes go straight to
+        # the simulation state without boxing Python floats
+        for iloan,loan in enumerate(self._loan_objs):
+            loan._bal_view = self._bal[iloan:iloan+1]
+
+    def _simulate(self, order_kind):
+        """
+        Runs the payoff kernel for the given priority-order kind until
+        all balances reach zero, growing the history arrays by doubling
+        whenever the simulation outlasts their row capacity. Returns
+        the number of months simulated, or -1 with empty histories when
+        the budget can never pay off the portfolio.
+        """
+        # A single loan has a closed-form schedule; skip the month loop
+        # entirely when the budget can pay it off
+        n_loans = len(self._loan_ids)
+        if n_loans == 1:
+            months_passed = self._simulate_single_loan()
+            if months_passed is not None:
+                return months_passed
+
+        # Snowball and avalanche allocations are constant between
+        # payoff events, so without a compiled kernel their histories
+        # are evaluated phase by phase from the closed form instead of
+        # looping months in Python; the spiral order drifts every month
+        # and always stays on the month-by-month kernel
+        if (not _HAVE_COMPILED_KERNELS
+                and order_kind != _simulate_numba.ORDER_SPIRAL):
+            months_passed = self._simulate_phases(order_kind)
+            if months_passed is not None:
+                return months_passed
+        max_months = 12
+        if n_loans > 0:
+            max_months = 2*max(loan.months_to_desired_completion
+                               for loan in self._loan_objs)
+
+        # Preallocate history arrays and run the kernel, doubling the
+        # row capacity and resuming if the horizon estimate was short;
+        # an unfinished run whose total balance has not dropped below
+        # the starting principal sum is diverging and stops with -1
+        # months and no history instead of doubling forever
+        start_total = self._bal.sum()
+        balance_hist  = np.empty((max_months, n_loans), dtype=np.float64)
+        payment_hist  = np.empty((max_months, n_loans), dtype=np.float64)
+        interest_hist = np.empty((max_months, n_loans), dtype=np.float64)
+        months_passed = 0
+        while True:
+            months_passed = _kernels.simulate(
+                self._bal, self._rates, self._min, self.budget_ceiling,
+                order_kind, balance_hist, payment_hist, interest_hist,
+                months_passed)
+            if months_passed < max_months or self._bal.sum() <= 0.:
+                break
+            if self._bal.sum() >= start_total:
+                self._finalize_simulation(balance_hist[:0], payment_hist[:0],
+                                          interest_hist[:0])
+                return -1
+            max_months *= 2
+            balance_hist  = np.concatenate([balance_hist, np.empty_like(balance_hist)])
+            payment_hist  = np.concatenate([payment_hist, np.empty_like(payment_hist)])
+            interest_hist = np.concatenate([interest_hist, np.empty_like(interest_hist)])
+
+        # Copy simulation state back onto the loans and per-loan history
+        self._finalize_simulation(balance_hist[:months_passed],
+                                  payment_hist[:months_passed],
+                                  interest_hist[:months_passed])
+        return months_passed
+
+    def _simulate_single_loan(self):
+        """
+        Evaluates a one-loan payoff analytically: the payoff month comes
+        from the closed-form amortization expression and the history
+        arrays are filled by broadcasting over the month index, with no
+        month loop. Returns None when the budget cannot pay off the
+        loan, so the caller can fall back to the simulated kernel.
+        """
+        # A minimum payment above the budget breaks the constant-payment
+        # assumption: once the balance drops below the minimum the
+        # monthly cap pays it off in full, deficit and all, rather than
+        # paying the budget. Fall back for that case.
+        if self._loan_objs[0].minimum_payment > self.budget_ceiling:
+            return None
+
+        # Closed-form month count; the whole budget goes to the one loan
+        balance = self._bal[0]
+        rate = self._rates[0]
+        payment = self.budget_ceiling
+        months_passed = self._loan_objs[0].months_to_payoff(balance, payment)
+        if not np.isfinite(months_passed):
+            return None
+
+        # Evaluate the balance trajectory over all months at once
+        months = np.arange(months_passed, dtype=np.float64)
+        if rate == 0.:
+            balance_hist = balance - payment*months
+        else:
+            sustained_balance = payment*(1. + rate)/rate
+            balance_hist = ((balance - sustained_balance)
+                            * np.exp(months*np.log1p(rate)) + sustained_balance)
+
+        # Payments are capped at the amount still owed; interest accrues
+        # on whatever the payment leaves behind
+        payment_hist = np.minimum(payment, balance_hist)
+        interest_hist = (balance_hist - payment_hist)*rate
+
+        # Copy simulation state back onto the loan and per-loan history
+        self._bal[0] = 0.
+        self._finalize_simulation(balance_hist[:, None], payment_hist[:, None],
+                                  interest_hist[:, None])
+        return months_passed
+
+    def _simulate_phases(self, order_kind):
+        """
+        Evaluates the payoff phase by phase instead of month by month.
+        Between payoff events the allocation is constant, so every
+        loan's trajectory follows the closed-form amortization
+        recurrence: each phase's interior is materialized in one
+        broadcast over the month index and only the boundary months
+        (payoffs, with their spillover cascades and residue clamping)
+        are stepped exactly. Returns None when the budget cannot retire
+        the remaining balances, so the caller can fall back to the
+        month-by-month kernel.
+        """
+        bal = self._bal
+        rates = self._rates
+        start_bal = bal.copy()
+
+        balance_rows  = []
+        payment_rows  = []
+        interest_rows = []
+        months_passed = 0
+        while bal.sum() > 0.:
+            # Current allocation: minimum payments capped at the amount
+            # still owed, plus the leftover budget (or deficit) spilled
+            # along the priority order
+            pay_min = np.minimum(self._min, bal)
+            amount_left = self.budget_ceiling - pay_min.sum()
+            if order_kind == _simulate_numba.ORDER_AVALANCHE:
+                order = np.argsort(rates, kind='stable')[::-1]
+            else:
+                order = np.argsort(bal, kind='stable')
+            pay = self._allocate(bal, pay_min, order, amount_left)
+
+            # A loan retiring under this allocation ends the phase
+            # immediately; step that month exactly so the spillover
+            # cascade and residue clamping match the kernel
+            active = bal > 0.
+            if np.any(active & (bal - pay <= _simulate_numba.ZERO_TOL)):
+                self._step_month(pay, balance_rows, payment_rows,
+                                 interest_rows)
+                months_passed += 1
+                continue
+
+            # Months until the first loan would retire under this
+            # constant allocation; the phase interior stops one month
+            # short of that boundary. A loan paying less than its
+            # configured minimum (budget deficit) also ends the phase
+            # once its balance drops below that minimum, because the
+            # per-month cap then retires it and re-routes the deficit.
+            horizon = np.inf
+            for iloan in np.flatnonzero(active):
+                months_i = self._loan_objs[iloan].months_to_payoff(
+                    bal[iloan], pay[iloan])
+                if pay[iloan] < self._min[iloan]:
+                    months_i = min(months_i,
+                                   _months_below(bal[iloan], pay[iloan],
+                                                 rates[iloan],
+                                                 self._min[iloan]))
+                horizon = min(horizon, months_i)
+            if not np.isfinite(horizon):
+                # The budget sustains the remaining balances forever;
+                # restore the starting state and let the kernel take
+                # over
+                bal[:] = start_bal
+                return None
+            m_phase = int(horizon) - 1
+
+            # The snowball spillover target must keep the smallest
+            # active balance for the allocation to stay constant
+            if order_kind == _simulate_numba.ORDER_SNOWBALL:
+                m_phase = self._snowball_stable_months(pay, order, m_phase)
+            if m_phase < 1:
+                self._step_month(pay, balance_rows, payment_rows,
+                                 interest_rows)
+                months_passed += 1
+                continue
+
+            # Materialize the whole phase interior from the closed form
+            # in one broadcast over the month index
+            months = np.arange(m_phase, dtype=np.float64)[:, None]
+            balance_block = _phase_balances(bal, pay, rates, months)
+            payment_block = np.broadcast_to(pay, balance_block.shape)
+            balance_rows.append(balance_block)
+            payment_rows.append(payment_block)
+            interest_rows.append((balance_block - payment_block)*rates)
+
+            # Advance the live state to the phase boundary
+            bal[:] = _phase_balances(bal, pay, rates, float(m_phase))
+            months_passed += m_phase
+
+        # Assemble the recorded blocks into the (months, loans) history
+        n_loans = bal.shape[0]
+        if balance_rows:
+            balance_hist  = np.vstack(balance_rows)
+            payment_hist  = np.vstack(payment_rows)
+            interest_hist = np.vstack(interest_rows)
+        else:
+            balance_hist  = np.empty((0, n_loans), dtype=np.float64)
+            payment_hist  = np.empty((0, n_loans), dtype=np.float64)
+            interest_hist = np.empty((0, n_loans), dtype=np.float64)
+        self._finalize_simulation(balance_hist, payment_hist, interest_hist)
+        return months_passed
+
+    def _snowball_stable_months(self, pay, order, m_phase):
+        """
+        Returns the number of interior months for which the loan
+        receiving the spillover keeps the smallest active balance, so
+        the constant-allocation closed form stays valid. Amortization
+        curves with differing rates can cross and cross back within a
+        phase, so every interior month is checked against the closed
+        form, not just the phase boundary.
+        """
+        bal = self._bal
+        active = bal > 0.
+        if np.count_nonzero(active) < 2 or m_phase < 2:
+            return m_phase
+        itarget = order[np.argmax(bal[order] > 0.)]
+        others = active.copy()
+        others[itarget] = False
+
+        # Evaluate all candidate interior months at once and stop the
+        # phase at the first month another loan drops below the target
+        months = np.arange(1, m_phase, dtype=np.float64)[:, None]
+        trial = _phase_balances(bal, pay, self._rates, months)
+        crossed = np.flatnonzero(trial[:, itarget]
+                                 > trial[:, others].min(axis=1))
+        if crossed.size == 0:
+            return m_phase
+        return int(crossed[0]) + 1
+
+    def _step_month(self, pay, balance_rows, payment_rows, interest_rows):
+        """
+        Advances the live simulation state by one exact month under the
+        given payment vector, mirroring the kernel's update: payments
+        apply before interest, balances within float residue of zero
+        are clamped, and retired loans accrue nothing.
+        """
+        bal = self._bal
+        balance_rows.append(bal.copy())
+        payment_rows.append(pay.copy())
+        remaining = bal - pay
+        remaining[remaining <= _simulate_numba.ZERO_TOL] = 0.
+        earned = remaining*self._rates
+        interest_rows.append(earned)
+        bal[:] = remaining + earned
+
+    def _finalize_simulation(self, balance_hist, payment_hist, interest_hist):
+        """
+        Copies the array-based simulation state back onto the loans and
+        into the per-loan history containers.
+        """
+        # Keep the (months, loans) arrays as the canonical history
+        # storage
+        self._bal_hist = balance_hist
+        self._pay_hist = payment_hist
+        self._int_hist = interest_hist
+
+        # Expose per-loan history columns; final balances already show
+        # through the loans' balance-array views
+        for iloan,loan_id in enumerate(self._loan_ids):
+            self.balance_history[loan_id]  = balance_hist[:, iloan]
+            self.payment_history[loan_id]  = payment_hist[:, iloan]
+            self.interest_history[loan_id] = interest_hist[:, iloan]
+
 def main():
     print('No default behavior.')
 
@@ -0,0 +1,144 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True
+"""
+Ahead-of-time compiled Cython build of the payoff kernels.
+
+Mirrors _simulate_numba exactly but carries no LLVM dependency and no
+first-call compile latency, for deployments where Numba's warmup or
+footprint is unacceptable. Built via setup.py when Cython is available;
+Wallet falls back to the Numba kernels when this extension is absent.
+"""
+import numpy as np
+
+# Priority-order kinds understood by the simulate kernel
+ORDER_SNOWBALL  = 0
+ORDER_AVALANCHE = 1
+ORDER_SPIRAL    = 2
+
+# Balances at or below this are clamped to zero so float residue from
+# spillover arithmetic cannot keep a paid-off loan alive
+cdef double ZERO_TOL = 1e-9
+
+
+cdef long[:] _compute_order(double[:] bal, double[:] rates, long order_kind):
+    # Cold path, run only at phase boundaries; defer to NumPy's sort.
+    # The avalanche order reverses the ascending stable sort to keep
+    # the original tie order (later loans before earlier ones).
+    if order_kind == 1:
+        return np.argsort(np.asarray(rates), kind='mergesort')[::-1]
+    elif order_kind == 2:
+        return np.argsort(np.asarray(bal)/np.asarray(rates), kind='mergesort')
+    return np.argsort(np.asarray(bal), kind='mergesort')
+
+
+def simulate(double[:] bal, double[:] rates, double[:] min_pmts,
+             double budget, long order_kind,
+             double[:, :] bal_hist, double[:, :] pay_hist,
+             double[:, :] int_hist, long month_start):
+    """
+    Advances the payoff simulation month by month, filling the
+    preallocated history arrays, until all balances reach zero or the
+    history arrays run out of rows. Returns the month counter, which
+    equals the history row capacity when the simulation is unfinished.
+    """
+    cdef Py_ssize_t n_loans = bal.shape[0]
+    cdef Py_ssize_t max_months = bal_hist.shape[0]
+    cdef Py_ssize_t month = month_start
+    cdef Py_ssize_t iloan, jloan
+    cdef double total_still_owed, amount_left, payment, balance
+    cdef double loan_amount_still_owed, earned_interest
+    cdef bint order_dirty = False
+    cdef double[:] pay = np.empty(n_loans)
+    cdef long[:] order = _compute_order(bal, rates, order_kind)
+
+    while month < max_months:
+        # Stop once everything is paid off
+        total_still_owed = 0.
+        for iloan in range(n_loans):
+            total_still_owed += bal[iloan]
+        if total_still_owed <= 0.:
+            break
+
+        # Record current balances
+        for iloan in range(n_loans):
+            bal_hist[month, iloan] = bal[iloan]
+
+        # Compute minimum payments, capped at the amount still owed;
+        # paid-off loans drop out of the update entirely
+        amount_left = budget
+        for iloan in range(n_loans):
+            if bal[iloan] == 0.:
+                pay[iloan] = 0.
+                continue
+            payment = min_pmts[iloan]
+            if bal[iloan] < payment:
+                payment = bal[iloan]
+            pay[iloan] = payment
+            amount_left -= payment
+
+        # Refresh the priority order only when it can have changed,
+        # with the same monotonicity scan as the Numba kernel
+        if order_kind == 2:
+            order = _compute_order(bal, rates, order_kind)
+        else:
+            if not order_dirty and order_kind == 0:
+                for jloan in range(1, n_loans):
+                    if bal[order[jloan-1]] > bal[order[jloan]]:
+                        order_dirty = True
+                        break
+            if order_dirty:
+                order = _compute_order(bal, rates, order_kind)
+                order_dirty = False
+
+        # Distribute the leftover budget along the priority order
+        for jloan in range(n_loans):
+            iloan = order[jloan]
+            loan_amount_still_owed = bal[iloan] - pay[iloan]
+            if loan_amount_still_owed == 0.:
+                continue
+            elif amount_left <= loan_amount_still_owed:
+                pay[iloan] += amount_left
+                break
+            else:
+                pay[iloan] += loan_amount_still_owed
+                amount_left -= loan_amount_still_owed
+
+        # Record and apply payments, then accrue and record interest,
+        # clamping float residue and flagging phase boundaries
+        for iloan in range(n_loans):
+            pay_hist[month, iloan] = pay[iloan]
+            if bal[iloan] == 0.:
+                int_hist[month, iloan] = 0.
+                continue
+            balance = bal[iloan] - pay[iloan]
+            if balance <= ZERO_TOL:
+                int_hist[month, iloan] = 0.
+                bal[iloan] = 0.
+                order_dirty = True
+                continue
+            earned_interest = balance*rates[iloan]
+            int_hist[month, iloan] = earned_interest
+            bal[iloan] = balance + earned_interest
+
+        # Increment month counter
+        month += 1
+    return month
+
+
+def simulate_batch(double[:, :] bal, double[:, :] rates,
+                   double[:, :] min_pmts, double[:] budgets,
+                   long[:] order_kinds, double[:, :, :] bal_hist,
+                   double[:, :, :] pay_hist, double[:, :, :] int_hist,
+                   long[:] months_out):
+    """
+    Advances several simulations in one call: each row of the
+    (strategies, loans) state arrays is an independent simulation with
+    its own budget and priority-order kind. History tensors are
+    (strategies, months, loans) and the per-strategy month counts are
+    written into months_out.
+    """
+    cdef Py_ssize_t istrategy
+    for istrategy in range(bal.shape[0]):
+        months_out[istrategy] = simulate(
+            bal[istrategy], rates[istrategy], min_pmts[istrategy],
+            budgets[istrategy], order_kinds[istrategy],
+            bal_hist[istrategy], pay_hist[istrategy], int_hist[istrategy], 0)